@@ -11,42 +11,105 @@ Usage:
 """
 
 import argparse
+import contextlib
 import csv
+import os
 import sys
+import tempfile
+
+# Output buffer size; fewer, larger writes for multi-hundred-MB results.
+OUTPUT_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+
+def _column(header, name):
+    """Index of column `name` in header, or None if absent."""
+    try:
+        return header.index(name)
+    except ValueError:
+        return None
+
+
+def _field(row, i):
+    """Stripped value at index i, or "" if the column is absent or the row is short."""
+    return row[i].strip() if i is not None and i < len(row) else ""
+
+
+@contextlib.contextmanager
+def _atomic_output(output_path):
+    """Open a temp file next to output_path; it replaces output_path only on success.
+
+    The input may be the output file itself, so it must not be truncated
+    while still being read; a failed run leaves any existing output untouched.
+    """
+    out = tempfile.NamedTemporaryFile(
+        "w", newline="", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE,
+        dir=os.path.dirname(output_path) or ".", prefix=".dedup-", suffix=".csv", delete=False,
+    )
+    try:
+        with out:
+            yield out
+        # NamedTemporaryFile is created 0600; give it the permissions open() would.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(out.name, 0o666 & ~umask)
+        os.replace(out.name, output_path)
+    except BaseException:
+        os.unlink(out.name)
+        raise
 
 
 def dedup(input_path, output_path=None, stats_only=False):
-    seen = set()
+    # Keys are stored raw: data_id strings in one set, (title, lat, lon)
+    # tuples in the other, so no composite string is built per row.
+    seen_did = set()
+    seen_tloc = set()
     rows_total = 0
     rows_kept = 0
     rows_dup = 0
     rows_no_key = 0
 
-    kept_rows = []
     header = None
+    writer = None
 
-    with open(input_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        header = reader.fieldnames
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(open(input_path, newline="", encoding="utf-8"))
+        reader = csv.reader(f)
+        header = next(reader, None)
 
         if not header:
             print("ERROR: CSV file has no header row.", file=sys.stderr)
             sys.exit(1)
 
+        # Rows are plain lists; resolve key columns to indexes once.
+        # Missing columns (or short rows) read as empty.
+        i_did = _column(header, "data_id")
+        i_title = _column(header, "title")
+        i_lat = _column(header, "latitude")
+        i_lon = _column(header, "longitude")
+        n_cols = len(header)
+
+        # Unique rows are written as they are found; only `seen` is kept in memory.
+        if not stats_only and output_path:
+            out = stack.enter_context(_atomic_output(output_path))
+            writer = csv.writer(out)
+            writer.writerow(header)
+
         for row in reader:
+            if not row:  # blank line, skipped like DictReader did
+                continue
             rows_total += 1
 
             # Primary key: data_id
-            data_id = row.get("data_id", "").strip()
+            data_id = _field(row, i_did)
             if data_id:
-                key = f"did:{data_id}"
+                key, seen = data_id, seen_did
             else:
                 # Fallback: title + lat + lon
-                title = row.get("title", "").strip()
-                lat = row.get("latitude", "").strip()
-                lon = row.get("longitude", "").strip()
+                title = _field(row, i_title)
+                lat = _field(row, i_lat)
+                lon = _field(row, i_lon)
                 if title and lat and lon:
-                    key = f"tloc:{title}|{lat}|{lon}"
+                    key, seen = (title, lat, lon), seen_tloc
                 else:
                     rows_no_key += 1
                     continue
@@ -57,15 +120,13 @@ def dedup(input_path, output_path=None, stats_only=False):
 
             seen.add(key)
             rows_kept += 1
-            if not stats_only:
-                kept_rows.append(row)
-
-    # Write output
-    if not stats_only and output_path:
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=header)
-            writer.writeheader()
-            writer.writerows(kept_rows)
+            if writer is not None:
+                # Pad short rows to the header width, as DictWriter's restval did.
+                if len(row) < n_cols:
+                    row += [""] * (n_cols - len(row))
+                writer.writerow(row)
+
+    if writer is not None:
         print(f"Written to: {output_path}")
 
     # Print stats
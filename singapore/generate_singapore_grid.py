@@ -4,15 +4,36 @@
 Uses a simplified polygon boundary of Singapore (main island, Sentosa, Jurong Island)
 and filters out ocean points using ray-casting. Outputs one "lat,lon" pair per line.
 
+If NumPy is installed the ray-cast runs vectorized over the whole grid at once,
+and with Shapely 2.x the containment test runs in GEOS instead; otherwise a
+pure-Python loop is used. All produce identical output.
+
 Usage:
     python3 generate_singapore_grid.py              # output coordinates to stdout
     python3 generate_singapore_grid.py --count       # show stats only
     python3 generate_singapore_grid.py --spacing 300 # custom spacing in meters
+    python3 generate_singapore_grid.py --workers 4   # process pool for the pure-Python fallback
 """
 
 import argparse
 import math
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Grid size (cells) above which the pure-Python fallback starts a process pool
+# by default; below it, pool start-up (notably under spawn) outweighs the scan.
+POOL_MIN_CELLS = 500_000
+
+try:
+    import numpy as np
+except ImportError:  # optional, falls back to the pure-Python loop
+    np = None
+
+try:
+    from shapely import Polygon, contains_xy, union_all
+except ImportError:  # optional; contains_xy needs Shapely >= 2.0
+    contains_xy = None
 
 # Simplified polygon boundaries for Singapore's land masses.
 # Each polygon is a list of (lat, lon) vertices.
@@ -102,39 +123,186 @@ PULAU_TEKONG = [
     (1.420, 104.010),
 ]
 
-POLYGONS = [MAIN_ISLAND, SENTOSA, JURONG_ISLAND, PULAU_UBIN, PULAU_TEKONG]
+# Convex polygon lying entirely inside MAIN_ISLAND, counter-clockwise in (lon, lat).
+# About 70% of land points fall inside it and can skip the full ray-cast.
+CORE_HULL = [
+    (1.280, 103.720),
+    (1.275, 103.830),
+    (1.285, 103.950),
+    (1.310, 104.035),
+    (1.340, 104.035),
+    (1.440, 103.900),
+    (1.450, 103.800),
+    (1.400, 103.700),
+    (1.320, 103.645),
+]
 
+# The small islands come first: their bounding boxes reject most points cheaply.
+POLYGONS = [SENTOSA, JURONG_ISLAND, PULAU_UBIN, PULAU_TEKONG, MAIN_ISLAND]
 
-def point_in_polygon(lat, lon, polygon):
-    """Ray-casting algorithm to test if a point is inside a polygon."""
-    n = len(polygon)
-    inside = False
-    j = n - 1
-    for i in range(n):
+
+def polygon_bbox(polygon):
+    """Return (lat_min, lat_max, lon_min, lon_max) of a polygon."""
+    lats = [lat for lat, _ in polygon]
+    lons = [lon for _, lon in polygon]
+    return min(lats), max(lats), min(lons), max(lons)
+
+
+POLY_BBOX = [polygon_bbox(p) for p in POLYGONS]
+
+# Shapely takes (x, y) = (lon, lat).
+LAND = union_all([Polygon([(lon, lat) for lat, lon in p]) for p in POLYGONS]) if contains_xy else None
+
+
+def polygon_edges(polygon):
+    """Precompute (yi, yj, xi, slope) for each polygon edge.
+
+    slope is d(lon)/d(lat) along the edge. Horizontal edges get slope 0;
+    the ray-cast never evaluates them since (yi > lat) == (yj > lat).
+    """
+    edges = []
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
         yi, xi = polygon[i]
         yj, xj = polygon[j]
-        if ((yi > lat) != (yj > lat)) and (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi):
-            inside = not inside
+        slope = (xj - xi) / (yj - yi) if yj != yi else 0.0
+        edges.append((yi, yj, xi, slope))
         j = i
+    return edges
+
+
+EDGES = [polygon_edges(p) for p in POLYGONS]
+
+# (n, 4) float64 copies of EDGES for the vectorized path, built once at import.
+EDGE_ARRAYS = [np.ascontiguousarray(e, dtype=np.float64) for e in EDGES] if np is not None else None
+
+
+def point_in_polygon(lat, lon, edges):
+    """Ray-casting algorithm to test if a point is inside a polygon given its polygon_edges()."""
+    inside = False
+    for yi, yj, xi, slope in edges:
+        if ((yi > lat) != (yj > lat)) and (lon < slope * (lat - yi) + xi):
+            inside = not inside
     return inside
 
 
-def point_in_any_polygon(lat, lon, polygons):
-    """Check if point falls inside any of the given polygons."""
-    for poly in polygons:
-        if point_in_polygon(lat, lon, poly):
+def point_in_convex(lat, lon, hull):
+    """Test a point against a convex, counter-clockwise polygon via cross-product signs."""
+    y0, x0 = hull[-1]
+    for y1, x1 in hull:
+        if (x1 - x0) * (lat - y0) - (y1 - y0) * (lon - x0) < 0:
+            return False
+        y0, x0 = y1, x1
+    return True
+
+
+def point_in_any_polygon(lat, lon, edges, bboxes):
+    """Check if point falls inside any of the given polygons.
+
+    edges and bboxes hold each polygon's polygon_edges() and polygon_bbox();
+    points outside a box skip its ray-cast.
+    """
+    for poly_edges, (ymin, ymax, xmin, xmax) in zip(edges, bboxes):
+        if lat < ymin or lat > ymax or lon < xmin or lon > xmax:
+            continue
+        if point_in_polygon(lat, lon, poly_edges):
             return True
     return False
 
 
-def generate_grid(spacing_m=250):
+def _axis(start, stop, step):
+    """Values start, start+step, ... up to stop, accumulated like the scan loop."""
+    values = []
+    v = start
+    while v <= stop:
+        values.append(v)
+        v += step
+    return values
+
+
+def points_in_any_polygon_np(lat, lon, edges, bboxes):
+    """Vectorized ray-casting: boolean mask of points inside any polygon.
+
+    Args:
+        lat, lon: 1-D float arrays of equal length.
+        edges: polygon_edges() of each polygon, as (n, 4) arrays (see EDGE_ARRAYS).
+        bboxes: polygon_bbox() of each polygon; only points inside it are ray-cast.
+    """
+    inside_any = np.zeros(lat.shape, dtype=bool)
+    for poly_edges, (ymin, ymax, xmin, xmax) in zip(edges, bboxes):
+        (idx,) = np.nonzero((lat >= ymin) & (lat <= ymax) & (lon >= xmin) & (lon <= xmax))
+        lat_c = lat[idx, None]
+        lon_c = lon[idx, None]
+        yi, yj, xi, slope = np.asarray(poly_edges, dtype=np.float64).T
+        cond1 = (yi[None, :] > lat_c) != (yj[None, :] > lat_c)
+        xint = slope[None, :] * (lat_c - yi[None, :]) + xi[None, :]
+        cross = cond1 & (lon_c < xint)
+        inside_any[idx] |= (cross.sum(axis=1) & 1).astype(bool)
+    return inside_any
+
+
+# Grid cells ray-cast per block in land_mask(); bounds the (cells x edges)
+# temporaries to a few MB regardless of grid spacing.
+MASK_BLOCK_CELLS = 16384
+
+
+def land_mask(lats, lons, edges, bboxes):
+    """Rasterize polygons onto the grid: mask[i, j] is True if (lats[i], lons[j]) is on land.
+
+    Evaluated in blocks of latitude rows of about MASK_BLOCK_CELLS cells each.
+    """
+    lat_a = np.array(lats)
+    lon_a = np.array(lons)
+    mask = np.zeros((len(lats), len(lons)), dtype=bool)
+    rows = max(1, MASK_BLOCK_CELLS // max(1, len(lons)))
+    for i0 in range(0, len(lats), rows):
+        i1 = min(i0 + rows, len(lats))
+        lat_g, lon_g = np.meshgrid(lat_a[i0:i1], lon_a, indexing="ij")
+        inside = points_in_any_polygon_np(lat_g.ravel(), lon_g.ravel(), edges, bboxes)
+        mask[i0:i1] = inside.reshape(lat_g.shape)
+    return mask
+
+
+def land_mask_shapely(lats, lons, land):
+    """Same as land_mask(), testing against a Shapely geometry with contains_xy."""
+    lat_a = np.array(lats)
+    lon_a = np.array(lons)
+    mask = np.zeros((len(lats), len(lons)), dtype=bool)
+    rows = max(1, MASK_BLOCK_CELLS // max(1, len(lons)))
+    for i0 in range(0, len(lats), rows):
+        i1 = min(i0 + rows, len(lats))
+        lat_g, lon_g = np.meshgrid(lat_a[i0:i1], lon_a, indexing="ij")
+        mask[i0:i1] = contains_xy(land, lon_g, lat_g)
+    return mask
+
+
+def _iter_land_points(lats, lons):
+    """Pure-Python scan of latitude rows, yielding land points in order."""
+    for lat in lats:
+        for lon in lons:
+            # CORE_HULL fast-accepts most of the main island before the full ray-cast.
+            if point_in_convex(lat, lon, CORE_HULL) or point_in_any_polygon(
+                lat, lon, EDGES, POLY_BBOX
+            ):
+                yield (round(lat, 6), round(lon, 6))
+
+
+def _scan_band(lats, lons):
+    """Process-pool worker: land points of one band of latitude rows, as a list."""
+    return list(_iter_land_points(lats, lons))
+
+
+def generate_grid(spacing_m=250, workers=None):
     """Generate grid coordinates covering Singapore's land area.
 
     Args:
         spacing_m: Grid spacing in meters (default 250m for 150m radius overlap).
+        workers: Processes for the pure-Python fallback, which splits the grid
+            into latitude bands (default: CPU count for grids over POOL_MIN_CELLS
+            cells, else 1). Unused when NumPy is available.
 
-    Returns:
-        List of (lat, lon) tuples on land.
+    Yields:
+        (lat, lon) tuples on land, row by row from the south-west corner.
     """
     # Convert meters to degrees at Singapore's latitude (~1.3N)
     # 1 degree latitude ≈ 111,320 meters
@@ -147,36 +315,65 @@ def generate_grid(spacing_m=250):
     lat_min, lat_max = 1.20, 1.47
     lon_min, lon_max = 103.59, 104.07
 
-    points = []
-    lat = lat_min
-    while lat <= lat_max:
-        lon = lon_min
-        while lon <= lon_max:
-            if point_in_any_polygon(lat, lon, POLYGONS):
-                points.append((round(lat, 6), round(lon, 6)))
-            lon += lon_step
-        lat += lat_step
+    lats = _axis(lat_min, lat_max, lat_step)
+    lons = _axis(lon_min, lon_max, lon_step)
 
-    return points
+    if np is not None:
+        if LAND is not None:
+            mask = land_mask_shapely(lats, lons, LAND)
+        else:
+            mask = land_mask(lats, lons, EDGE_ARRAYS, POLY_BBOX)
+        lat_r = [round(lat, 6) for lat in lats]
+        lon_r = [round(lon, 6) for lon in lons]
+        # Row by row, so no per-cell index list is built for the whole mask.
+        for i, row in enumerate(mask):
+            lat = lat_r[i]
+            for j in np.flatnonzero(row).tolist():
+                yield (lat, lon_r[j])
+        return
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(lats) * len(lons) > POOL_MIN_CELLS else 1
+    workers = min(workers, len(lats))
+    if workers <= 1:
+        yield from _iter_land_points(lats, lons)
+        return
+
+    band = -(-len(lats) // workers)  # ceil division
+    bands = [lats[i:i + band] for i in range(0, len(lats), band)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for points in pool.map(_scan_band, bands, [lons] * len(bands)):
+            yield from points
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate Singapore grid coordinates")
     parser.add_argument("--count", action="store_true", help="Show stats without generating output")
     parser.add_argument("--spacing", type=int, default=250, help="Grid spacing in meters (default: 250)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for the pure-Python fallback (default: CPU count for large grids, else 1)")
     args = parser.parse_args()
 
-    points = generate_grid(spacing_m=args.spacing)
+    points = generate_grid(spacing_m=args.spacing, workers=args.workers)
 
     if args.count:
-        lats = [p[0] for p in points]
-        lons = [p[1] for p in points]
+        # Stats are accumulated in one pass; the points are never held in memory.
+        count = 0
+        lat_lo = lon_lo = math.inf
+        lat_hi = lon_hi = -math.inf
+        for lat, lon in points:
+            count += 1
+            lat_lo = min(lat_lo, lat)
+            lat_hi = max(lat_hi, lat)
+            lon_lo = min(lon_lo, lon)
+            lon_hi = max(lon_hi, lon)
         print(f"Grid spacing: {args.spacing}m")
-        print(f"Total land points: {len(points)}")
-        print(f"Latitude range: {min(lats):.6f} to {max(lats):.6f}")
-        print(f"Longitude range: {min(lons):.6f} to {max(lons):.6f}")
-        est_hours_low = len(points) * 2 / 3600
-        est_hours_high = len(points) * 4 / 3600
+        print(f"Total land points: {count}")
+        if count:
+            print(f"Latitude range: {lat_lo:.6f} to {lat_hi:.6f}")
+            print(f"Longitude range: {lon_lo:.6f} to {lon_hi:.6f}")
+        est_hours_low = count * 2 / 3600
+        est_hours_high = count * 4 / 3600
         print(f"Estimated scrape time: {est_hours_low:.1f} - {est_hours_high:.1f} hours (at 2-4s per cell)")
     else:
         for lat, lon in points: